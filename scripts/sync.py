@@ -44,47 +44,103 @@ defined in the SSH configuration file (~/.ssh/config). The paths of all files
 or directories have to be given absolute, relative (to the home directory of
 the particular machine) or, if given, relative to the `_PATH` option.
 
+Hostnames (of the current machine and given via the command line) are matched
+exactly against the top-level entries. If no exact match is found, the longest
+entry that is contained in the hostname is used (e.g., `host1` for
+`host1.example.com`).
+
 The `ALIASES` section offers the possibility to assign aliases for the
 different hosts.
 
+To speed up subsequent runs, the parsed configuration is cached in a file next
+to the configuration file (e.g., ~/.sync.yml.cache). The cache is renewed
+automatically whenever the configuration file changes.
+
 """
 
 from __future__ import annotations
 
 import asyncio
+import atexit
+import json
 import logging
+import logging.handlers
+import os
+import re
+import shlex
+import shutil
 import socket
 import subprocess
-import time
+import sys
+import tempfile
 from argparse import ArgumentParser
 from pathlib import Path
 from typing import TYPE_CHECKING, Literal
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML without libyaml bindings
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    import uvloop
+except ImportError:  # Optional, faster event loop
+    uvloop = None
+
 if TYPE_CHECKING:
     from argparse import Namespace
+    from collections.abc import AsyncIterator
 
 
 class Sync():
     """Synchronization class."""
 
     _ALIASES = 'ALIASES'
+    _CACHE_SUFFIX = '.cache'
+    _CHUNK_SIZE = 2**16
+    _CONTROL_PATH = '~/.ssh/cm-sync-%C'
+    _CONTROL_PERSIST = 60
     _COPYRIGHT = 'Copyright (c) 2023 Manuel Schlund <schlunma@gmail.com>'
+    _DEFAULT_CIPHER = 'aes128-gcm@openssh.com'
     _DEFAULT_CONFIGFILE = '~/.sync.yml'
-    _DEFAULT_EXCLUDE = '--exclude="*.swp" '
+    _DEFAULT_EXCLUDE = '*.swp'
+    _DEFAULT_JOBS = 8
     _DEFAULT_LOGFILE = '~/.sync.log'
     _DEFAULT_NTASKS = 6
     _DELIMITER = 50 * '-'
+    _DRY_RUN_LOG_PREFIXES = {
+        'created': 'Would create directory',
+        'deleted': 'Would delete',
+        'moved': 'Would move',
+        'new_dir': 'Would create directory',
+    }
+    _LOGGER_NAME = 'sync'
+    _LOG_BUFFER_CAPACITY = 1024
     _LOG_FORMATTER = logging.Formatter(
         '%(asctime)s %(levelname)s: %(message)s'
     )
+    _LOG_LINE_REGEX = re.compile(
+        r'(?P<skip>\S+ \./$)|'
+        r'created directory (?P<created>.+)|'
+        r'\*deleting +(?P<deleted>.+)|'
+        r'cd\S* (?P<new_dir>.+)|'
+        r'(?:[<>c](?P<link>L)|[<>ch][fdLDS])\S* (?P<moved>.+?)(?(link) -> .*)$'
+    )
+    _LOG_PREFIXES = {
+        'created': 'Created directory',
+        'deleted': 'Deleted',
+        'moved': 'Successfully moved',
+        'new_dir': 'Created directory',
+    }
+    _MAX_EXCLUDE_ARGS = 5
+    _MAX_SSH_SESSIONS = 10
     _NAME = 'Easy SSH synchronization'
     _PATH = '_PATH'
-    _PRE_COMMAND = (
-        'if command -v "checkssh" &>/dev/null; then\ncheckssh\nfi'
-    )
-    _SYNC_COMMAND = 'rsync -auP'
+    _PRE_COMMAND = 'checkssh'
+    _SSH_COMMAND = 'ssh'
+    _SYNC_COMMAND = ('rsync', '-auP', '--itemize-changes')
 
     def __init__(self) -> None:
         """Initialize class instance."""
@@ -96,42 +152,183 @@ class Sync():
         self.config: dict = self._read_config()
 
         (self.this_host, self.target_hosts) = self._get_hosts()
-        self.sync_command: str = self._get_sync_command()
+        self.elements: dict[str, frozenset[str]] = self._get_elements()
+        self.home: str = self._expanduser('~/')
+        self.target_paths: dict[str, str] = self._get_target_paths()
+        self.control_path: str = self._get_control_path()
+        self.ssh_command: list[str] = self._get_ssh_command()
+        self.exclude_file: str | None = self._get_exclude_file()
+        self.sync_command: list[str] = self._get_sync_command()
+        self.log_prefixes: dict[str, str] = (
+            self._DRY_RUN_LOG_PREFIXES if self.args.dry_run else
+            self._LOG_PREFIXES
+        )
 
         self.semaphores = self._get_semaphores()
 
+    def _check_control_master(self, host: str) -> bool:
+        """Check if SSH master connection to host is running."""
+        process = subprocess.run(
+            [*self.ssh_command, '-O', 'check', host],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        return process.returncode == 0
+
+    def _close_control_masters(self, hosts: list[str]) -> None:
+        """Close SSH master connections.
+
+        The master connections only stop accepting new sessions; sessions that
+        are still running (e.g., of a concurrent run of this script) are not
+        affected.
+
+        """
+        for host in hosts:
+            self.logger.debug("Closing SSH master connection to '%s'", host)
+            subprocess.run(
+                [*self.ssh_command, '-O', 'stop', host],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+
+    def _exec_sync(self, direction: Literal['up', 'down']) -> None:
+        """Replace current process with rsync if possible.
+
+        This is only done for a single synchronization task whose output does
+        not need to be processed (i.e., no log file is written). rsync then
+        directly prints its progress to the terminal.
+
+        """
+        if len(self.target_hosts) != 1:
+            return
+        if not self.args.no_logfile or self.args.quiet:
+            return
+        if self.exclude_file is not None:
+            return  # temporary exclude file could not be removed at exit
+        target_host = self.target_hosts[0]
+        elements = self.elements[self.this_host] & self.elements[target_host]
+        if len(elements) != 1:
+            return
+
+        # Get synchronization command (SSH must not start a master connection
+        # since it could not be closed at exit); use --relative for elements
+        # with identical relative paths (equivalent to --files-from used
+        # otherwise, including --no-implied-dirs)
+        (element,) = elements
+        (this_root, this_path, target_root, target_path) = (
+            self._get_element_paths(element, target_host)
+        )
+        command = self._get_sync_command(multiplex=False)
+        if this_path == target_path:
+            command.extend(['-R', '--no-implied-dirs'])
+            this_element = f'{this_root}./{this_path}'
+            target_element = f'{target_root}./{target_path}'
+            (this_dest, target_dest) = (this_root, target_root)
+        else:
+            this_element = this_dest = this_root + this_path
+            target_element = target_dest = target_root + target_path
+        if direction == 'up':
+            command.extend([this_element, target_dest])
+        else:
+            command.extend([target_element, this_dest])
+
+        self.logger.debug(
+            "Replacing current process with '%s'", shlex.join(command)
+        )
+        os.execvp(command[0], command)
+
+    def _get_control_path(self) -> str:
+        """Get path of SSH control sockets (`%C` is expanded by SSH)."""
+        control_path = Path(self._CONTROL_PATH).expanduser()
+        control_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        return str(control_path)
+
+    def _get_element_paths(
+        self, element: str, target_host: str
+    ) -> tuple[str, str, str, str]:
+        """Get root directories and relative paths of an element.
+
+        Returns root directory and relative path of the element on the current
+        machine followed by root directory and relative path of the element on
+        the target host.
+
+        """
+        # Current machine
+        this_path = self.config[self.this_host][element]
+        if this_path.startswith('/'):
+            this_root = '/'
+            this_path = this_path[1:]
+        else:
+            this_root = self.home
+
+        # Target host
+        target_path = self.config[target_host][element]
+        if target_host in self.target_paths:
+            target_root = self.target_paths[target_host]
+        elif target_path.startswith('/'):
+            target_root = f'{target_host}:/'
+            target_path = target_path[1:]
+        else:
+            target_root = f'{target_host}:./'
+
+        return (this_root, this_path, target_root, target_path)
+
+    def _get_elements(self) -> dict[str, frozenset[str]]:
+        """Get elements (without options like `_PATH`) of involved hosts."""
+        elements = {
+            host: frozenset(self.config[host]) - {self._PATH}
+            for host in (self.this_host, *self.target_hosts)
+        }
+        return elements
+
+    def _get_exclude_file(self) -> str | None:
+        """Get temporary file with exclude patterns (if necessary).
+
+        Many exclude patterns are passed via a temporary file to keep the
+        command line short. Each line is written as explicit exclude rule
+        since rsync treats lines starting with `#` or `;` as comments.
+
+        """
+        excludes = [self._DEFAULT_EXCLUDE, *self.args.exclude]
+        if len(excludes) <= self._MAX_EXCLUDE_ARGS:
+            return None
+        with tempfile.NamedTemporaryFile(
+            mode='w', prefix='sync-exclude-', delete=False
+        ) as exclude_file:
+            exclude_file.writelines(f'- {exc}\n' for exc in excludes)
+        atexit.register(os.remove, exclude_file.name)
+        return exclude_file.name
+
     def _get_hosts(self) -> tuple[str, list[str]]:
         """Get correct host names (according to the configuration file)."""
-        all_hosts = [host for host in self.config if host != self._ALIASES]
+        all_hosts = dict.fromkeys(
+            host for host in self.config if host != self._ALIASES
+        )
+
+        # Current machine
         this_host_fullname = socket.gethostname()
-        this_host = None
-        other_hosts = []
-        for host in all_hosts:
-            if host in this_host_fullname:
-                this_host = host
-            else:
-                other_hosts.append(host)
+        this_host = self._match_host(this_host_fullname, all_hosts)
+        other_hosts = [host for host in all_hosts if host != this_host]
 
-        # Process input
+        # Process input (ignore duplicates)
         target_hosts = []
         if 'all' in self.args.targets:
             target_hosts = other_hosts
         else:
             for target_host in self.args.targets:
-                for host in all_hosts:
-                    if host in target_host:
-                        target_hosts.append(host)
-                        break
-                else:
-                    logging.warning(
+                host = self._match_host(target_host, all_hosts)
+                if host is None:
+                    self.logger.warning(
                         "Could not find host '%s' in configuration file '%s'",
                         target_host,
                         self.args.configfile,
                     )
+                elif host not in target_hosts:
+                    target_hosts.append(host)
 
         # Catch invalid input
         if this_host is None:
-            logging.error(
+            self.logger.error(
                 "Could not find current machine '%s' in configuration file "
                 "'%s'",
                 this_host_fullname,
@@ -139,7 +336,7 @@ class Sync():
             )
             exit(1)
         if not target_hosts:
-            logging.error(
+            self.logger.error(
                 "Could not find any valid host for %s in configuration file "
                 "'%s'",
                 self.args.targets,
@@ -147,142 +344,229 @@ class Sync():
             )
             exit(1)
         if this_host in target_hosts:
-            logging.error("Cannot sync host '%s' with itself", this_host)
+            self.logger.error("Cannot sync host '%s' with itself", this_host)
             exit(1)
 
-        logging.debug(
+        self.logger.debug(
             "Found hosts: current machine: '%s', target host(s): %s",
             this_host,
             target_hosts,
         )
         return (this_host, target_hosts)
 
-    def _get_log_info(self, stdout: str, src: str, dest: str) -> list[str]:
-        """Get info log messages for a single synchronization process."""
-        info_list = []
-        for info in stdout.split('\n')[1:]:
-            # Not relevant information
-            not_relevant = any([
-                '\r' in info,
-                info == '',
-                info == './',
-                info.startswith('sent '),
-                info.startswith('total size is'),
-            ])
-            if not_relevant:
-                pass
-
-            # New directory created
-            elif 'created directory' in info:
-                if self.args.dry_run:
-                    info = info.replace(
-                        "created directory ", "Would create directory '"
-                    ) + "'"
-                else:
-                    info = info.replace(
-                        "created directory ", "Created directory '"
-                    ) + "'"
-                info_list.append(f'    {info}')
-
-            # File deleted
-            elif info.startswith('deleting'):
-                info = info.replace('deleting ', '', 1)
-                d_str = dest + info if dest.endswith('/') else dest
-                if self.args.dry_run:
-                    prefix = "    Would delete "
-                else:
-                    prefix = "    Deleted "
-                info_list.append(f"{prefix}'{d_str}'")
-
-            # File moved
-            else:
-                s_str = src + info if src.endswith('/') else src
-                d_str = dest + info if dest.endswith('/') else dest
-                if self.args.dry_run:
-                    prefix = "    Would move "
-                else:
-                    prefix = "    Successfully moved "
-                info_list.append(f"{prefix}'{s_str}' to '{d_str}'")
+    def _get_log_info(self, line: str, src: str, dest: str) -> str | None:
+        """Get info log message for a single line of rsync output."""
+        match = self._LOG_LINE_REGEX.match(line)
 
-        return list(set(info_list))
+        # Not relevant information (e.g., progress or unchanged files)
+        if match is None or match['skip'] is not None:
+            return None
 
-    async def _get_one_sync_task(
-        self, element: str, direction: Literal['up', 'down'], target_host: str,
-    ) -> tuple[str, str, str, str]:
-        """Get one synchronization task."""
-        # Get target host path
-        if self._PATH in self.config[target_host]:
-            target_host_path = self._expanduser(
-                self.config[target_host][self._PATH]
-            )
-        elif self.config[target_host][element].startswith('/'):
-            target_host_path = f'{target_host}:'
-        else:
-            target_host_path = f'{target_host}:./'
+        # Type of change is given by the name of the matched group
+        change = match.lastgroup
+        info = match[change]
+        prefix = self.log_prefixes[change]
 
-        # Get elements
-        if self.config[self.this_host][element].startswith('/'):
-            this_element = self.config[self.this_host][element]
-        else:
-            this_element = self._expanduser(
-                f'~/{self.config[self.this_host][element]}'
-            )
-        target_element = target_host_path + self.config[target_host][element]
+        # Root directory created (path is given in full)
+        if change == 'created':
+            return f"    {prefix} '{info}'"
 
-        # Get synchronization command
-        if direction == 'up':
-            src = this_element
-            dest = target_element
+        # Directory created, file deleted, or file moved
+        d_str = dest + info if dest.endswith('/') else dest
+        if change == 'moved':
+            s_str = src + info if src.endswith('/') else src
+            return f"    {prefix} '{s_str}' to '{d_str}'"
+        return f"    {prefix} '{d_str}'"
+
+    async def _get_one_sync_task(
+        self,
+        src: str,
+        dest: str,
+        direction: Literal['up', 'down'],
+        target_host: str,
+        files: list[str] | None = None,
+    ) -> tuple[list[str], str]:
+        """Get one synchronization task.
+
+        If `files` is given, `src` and `dest` are interpreted as root
+        directories and only the given files (relative to these roots) are
+        synchronized using a single rsync call.
+
+        """
+        if files is None:
+            command = [*self.sync_command, src, dest]
+            file_list = None
         else:
-            src = target_element
-            dest = this_element
-        command_str = f'{self.sync_command} {src} {dest}'
+            # --files-from implies --relative; --no-implied-dirs leaves
+            # existing parent directories (and symlinks to directories) of the
+            # files untouched
+            command = [
+                *self.sync_command,
+                '-r',
+                '--no-implied-dirs',
+                '--files-from=-',
+                src,
+                dest,
+            ]
+            file_list = '\n'.join(files).encode('utf-8')
 
         # Initialize synchronization task
-        logging.debug("    Initializing command '%s'", command_str)
+        self.logger.debug("    Initializing command '%s'", shlex.join(command))
+        if files is not None:
+            self.logger.debug("    Files: %s", files)
 
         # Limit number of concurrent tasks
         # see https://docs.python.org/3/library/asyncio-sync.html#semaphore
-        async with self.semaphores[target_host][direction]:
-            process = await asyncio.create_subprocess_shell(
-                command_str, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        async with (
+            self.semaphores[target_host][direction],
+            self.semaphores[target_host]['sessions'],
+        ):
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=None if file_list is None else subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            if file_list is not None:
+                process.stdin.write(file_list)
+                process.stdin.close()
+            (info_list, stderr) = await asyncio.gather(
+                self._read_log_info(process.stdout, src, dest),
+                process.stderr.read(),
             )
-            out = await process.communicate()
+            await process.wait()
 
-        result = (src, dest, out[0].decode('utf-8'), out[1].decode('utf-8'))
-        return result
+        return (info_list, stderr.decode('utf-8', errors='replace'))
 
     def _get_semaphores(self) -> dict:
-        """Get semaphore for each event loop."""
+        """Get semaphores for each host and direction.
+
+        In addition, the number of SSH sessions per host (i.e., tasks
+        multiplexed over the master connection) is limited to the default
+        `MaxSessions` of the SSH server (10). Since upload and download are run
+        sequentially, this only matters if `--ntasks` is larger than that.
+
+        """
         semaphores = {
             host: {
                 'up': asyncio.Semaphore(self.args.ntasks),
                 'down': asyncio.Semaphore(self.args.ntasks),
+                'sessions': asyncio.Semaphore(self._MAX_SSH_SESSIONS),
             } for host in self.target_hosts
         }
         return semaphores
 
-    def _get_sync_command(self) -> str:
-        """Get synchronization command."""
-        exclude = self._DEFAULT_EXCLUDE
-        try:
-            for exc in self.args.exclude:
-                exclude += '--exclude="' + exc + '" '
-        except TypeError:
-            pass
-        sync_command = self._SYNC_COMMAND + ' ' + exclude.strip()
+    def _get_ssh_command(self) -> list[str]:
+        """Get SSH command used for all connections to remote hosts.
+
+        rsync compresses data itself if desired (see `--compress`), so SSH
+        compression, X11 forwarding, and pseudo-terminal allocation are
+        disabled.
+
+        """
+        ssh_command = [self._SSH_COMMAND, '-T', '-x', '-o', 'Compression=no']
+        if self.args.cipher:
+            ssh_command.extend(['-c', self.args.cipher])
+        ssh_command.extend(['-o', f'ControlPath={self.control_path}'])
+        return ssh_command
+
+    def _get_sync_command(self, multiplex: bool = True) -> list[str]:
+        """Get synchronization command (without source and destination).
+
+        If `multiplex` is False, SSH only uses already running master
+        connections, but never becomes a master connection itself.
+
+        """
+        sync_command = [*self._SYNC_COMMAND]
+
+        if self.exclude_file is not None:
+            sync_command.append(f'--exclude-from={self.exclude_file}')
+        else:
+            excludes = [self._DEFAULT_EXCLUDE, *self.args.exclude]
+            sync_command.extend([f'--exclude={exc}' for exc in excludes])
 
         if self.args.dry_run:
-            sync_command += ' -n'
+            sync_command.append('-n')
 
         if self.args.delete:
-            sync_command += ' --delete'
+            sync_command.append('--delete')
+
+        if self.args.compress:
+            sync_command.append('-z')
+
+        if self.args.whole_file:
+            sync_command.append('--whole-file')
+
+        if self.args.block_size is not None:
+            sync_command.append(f'--block-size={self.args.block_size}')
+
+        # Reuse SSH master connections (see _open_control_masters)
+        if multiplex:
+            ssh_options = [
+                '-o',
+                'ControlMaster=auto',
+                '-o',
+                f'ControlPersist={self._CONTROL_PERSIST}',
+            ]
+        else:
+            ssh_options = ['-o', 'ControlMaster=no']
+        ssh_command = shlex.join([*self.ssh_command, *ssh_options])
+        sync_command.extend(['-e', ssh_command])
 
         return sync_command
 
+    def _get_target_paths(self) -> dict[str, str]:
+        """Get expanded `_PATH` options of all target hosts (if given)."""
+        target_paths = {
+            host: self._expanduser(self.config[host][self._PATH])
+            for host in self.target_hosts if self._PATH in self.config[host]
+        }
+        return target_paths
+
+    def _open_control_masters(self, hosts: list[str]) -> None:
+        """Open one SSH master connection per given host.
+
+        All synchronization tasks for a host are multiplexed over this
+        connection, i.e., only a single SSH handshake per host is necessary.
+        If the master connection cannot be established, the tasks simply
+        fall back to individual SSH connections. Master connections opened
+        here are closed at exit.
+
+        """
+        # Open master connections concurrently; a no-op remote command is used
+        # instead of `-N` so that SSH always terminates: the master goes to
+        # background once the command finished (`ControlPersist`), and if
+        # another process created the control socket in the meantime, SSH
+        # disables multiplexing and simply exits
+        processes = {}
+        for host in hosts:
+            self.logger.debug("Opening SSH master connection to '%s'", host)
+            processes[host] = subprocess.Popen(
+                [
+                    *self.ssh_command,
+                    '-o',
+                    f'ControlPersist={self._CONTROL_PERSIST}',
+                    '-M',
+                    host,
+                    'true',
+                ],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        opened_hosts = [
+            host for (host, process) in processes.items()
+            if process.wait() == 0 and self._check_control_master(host)
+        ]
+        atexit.register(self._close_control_masters, opened_hosts)
+
     def _parse_args(self) -> Namespace:
         """Parse command line arguments."""
         args = self.parser.parse_args()
+        if args.jobs < 1:
+            self.parser.error(
+                f"argument -j/--jobs: must be at least 1, got {args.jobs}"
+            )
         args.configfile = Path(args.configfile).expanduser()
         args.logfile = Path(args.logfile).expanduser()
 
@@ -290,74 +574,110 @@ class Sync():
 
     def _print_welcome(self) -> None:
         """Print welcome message."""
-        logging.info(self._DELIMITER)
-        logging.info(self._NAME)
-        logging.info(self._COPYRIGHT)
-        logging.info(
+        self.logger.info(self._DELIMITER)
+        self.logger.info(self._NAME)
+        self.logger.info(self._COPYRIGHT)
+        self.logger.info(
             "This program comes with ABSOLUTELY NO WARRANTY; for details "
             "type `python sync.py --help`"
         )
-        logging.info(
+        self.logger.info(
             "This is free software, and you are welcome to redistribute it "
             "under certain conditions (see GNU General Public License, "
             "Version 3 or later)"
         )
-        logging.info(self._DELIMITER)
+        self.logger.info(self._DELIMITER)
         if self.args.dry_run:
             dry_run_str = "simulation of "
         else:
             dry_run_str = ""
-        logging.debug("Starting %ssynchronization", dry_run_str)
+        self.logger.debug("Starting %ssynchronization", dry_run_str)
 
-        # Warn if user selected --delete option
+        # Warn if user selected --delete option (and ask for confirmation in
+        # interactive sessions)
         if self.args.delete:
-            logging.warning("--delete option may lead to loss of data")
-            time.sleep(2.0)
+            self.logger.warning("--delete option may lead to loss of data")
+            if sys.stdin.isatty() and not self.args.quiet:
+                try:
+                    answer = input("Continue? [y/N] ")
+                except EOFError:
+                    answer = ''
+                if answer.strip().lower() not in ('y', 'yes'):
+                    self.logger.info("Aborted synchronization")
+                    exit(0)
 
     async def _process_host(
         self, target_host: str, direction: Literal['up', 'down']
     ) -> bool:
         """Perform concurrent one-way synchronization to one host."""
         # Get direction
-        prefix = 'Upload' if direction == 'up' else 'Download'
+        if direction == 'up':
+            prefix = 'Upload'
+            hosts = (self.this_host, target_host)
+        else:
+            prefix = 'Download'
+            hosts = (target_host, self.this_host)
+        dry_run_str = " (simulation)" if self.args.dry_run else ""
 
-        # Get elements
-        elements_this = list(self.config[self.this_host])
-        elements_target = list(self.config[target_host])
+        # Get elements shared by the two hosts
+        elements = self.elements[self.this_host] & self.elements[target_host]
 
         # Check if the hosts share elements
-        if set(elements_this).isdisjoint(elements_target):
-            logging.info(
+        if not elements:
+            self.logger.info("%s%s '%s' --> '%s'", prefix, dry_run_str, *hosts)
+            self.logger.info(
                 "    %s: the two hosts do not share common elements", prefix
             )
             return True
 
         # Iterate through elements and create a process for each
-        # synchronization task
+        # synchronization task; elements that have identical paths relative to
+        # common root directories on both hosts are synchronized in a single
+        # task
         successful = True
         tasks = []
-        for element in elements_this:
-            if element == self._PATH:
+        file_groups: dict[tuple[str, str], list[str]] = {}
+        for element in sorted(elements):
+            (this_root, this_path, target_root, target_path) = (
+                self._get_element_paths(element, target_host)
+            )
+            if this_path == target_path:
+                file_groups.setdefault((this_root, target_root), []).append(
+                    this_path
+                )
                 continue
-            if element in elements_target:
-                tasks.append(
-                    self._get_one_sync_task(element, direction, target_host)
+            this_element = this_root + this_path
+            target_element = target_root + target_path
+            if direction == 'up':
+                (src, dest) = (this_element, target_element)
+            else:
+                (src, dest) = (target_element, this_element)
+            tasks.append(
+                self._get_one_sync_task(src, dest, direction, target_host)
+            )
+        for ((this_root, target_root), files) in file_groups.items():
+            if direction == 'up':
+                (src, dest) = (this_root, target_root)
+            else:
+                (src, dest) = (target_root, this_root)
+            tasks.append(
+                self._get_one_sync_task(
+                    src, dest, direction, target_host, files=files
                 )
+            )
 
         # Run synchronization tasks concurrently
         results = await asyncio.gather(*tasks)
 
-        # Log sync operations
+        # Log sync operations (all at once to avoid interleaved output of
+        # hosts that are processed concurrently)
+        self.logger.info("%s%s '%s' --> '%s'", prefix, dry_run_str, *hosts)
         for result in results:
-            (src, dest, stdout, stderr) = result
-            info_list = self._get_log_info(stdout, src, dest)
+            (info_list, stderr) = result
 
             # Info
-            if stdout:
-                logging.debug(f"    {stdout}")
-            if info_list:
-                for info in info_list:
-                    logging.info(info)
+            for info in info_list:
+                self.logger.info(info)
 
             # Errors
             connection_error = any([
@@ -365,66 +685,146 @@ class Sync():
                 'Could not resolve hostname' in stderr,
             ])
             if connection_error:
-                logging.error(
+                self.logger.error(
                     "    %s: cannot connect to host '%s'", prefix, target_host
                 )
                 return False
             if stderr:
-                logging.warning(
-                    "    %s", stderr.strip('\n').replace('\n', '; ')
-                )
+                if self.logger.isEnabledFor(logging.WARNING):
+                    self.logger.warning(
+                        "    %s", stderr.strip('\n').replace('\n', '; ')
+                    )
                 successful = False
 
         return successful
 
+    async def _process_hosts(
+        self, perform_up: bool, perform_down: bool
+    ) -> None:
+        """Perform concurrent synchronization to all target hosts."""
+        semaphore = asyncio.Semaphore(self.args.jobs)
+
+        async def sync_host(target_host: str) -> None:
+            """Limit number of concurrently processed hosts."""
+            async with semaphore:
+                await self._sync_host(target_host, perform_up, perform_down)
+
+        await asyncio.gather(*[sync_host(h) for h in self.target_hosts])
+
+    async def _read_log_info(
+        self, stdout: asyncio.StreamReader, src: str, dest: str
+    ) -> list[str]:
+        """Read rsync output line by line and get info log messages."""
+        info_dict: dict[str, None] = {}
+        async for line in self._read_lines(stdout):
+            self.logger.debug("    %s", line)
+
+            # Remove duplicates, but preserve order
+            info = self._get_log_info(line, src, dest)
+            if info is not None:
+                info_dict[info] = None
+
+        return list(info_dict)
+
     def _read_config(self) -> dict:
         """Read configuration file."""
         if not self.args.configfile.is_file():
-            logging.error(
+            self.logger.error(
                 "Configuration file '%s' does not exist", self.args.configfile)
             exit(1)
 
-        with open(self.args.configfile, 'r') as in_file:
-            config = yaml.safe_load(in_file)
-        logging.debug(
+        # Parsing YAML is slow, so use cached configuration if it is
+        # up-to-date (identified by modification time and size of file)
+        stat = self.args.configfile.stat()
+        cache_key = (stat.st_mtime_ns, stat.st_size)
+        cache_file = self.args.configfile.with_name(
+            self.args.configfile.name + self._CACHE_SUFFIX
+        )
+        config = self._read_config_cache(cache_file, cache_key)
+        if config is None:
+            with open(self.args.configfile, 'r') as in_file:
+                config = yaml.load(in_file, Loader=YamlLoader)
+            self._write_config_cache(cache_file, cache_key, config)
+        self.logger.debug(
             "Successfully read configuration file '%s'", self.args.configfile
         )
 
         # Process possible aliases
-        if self._ALIASES in config:
-            aliases = config[self._ALIASES]
-            for (i, old_host) in enumerate(self.args.targets):
-                if old_host in aliases:
-                    new_host = aliases[old_host]
-                    self.args.targets[i] = new_host
-                    logging.info("Aliased '%s' to '%s'", old_host, new_host)
+        aliases = config.get(self._ALIASES) or {}
+        for old_host in self.args.targets:
+            if old_host in aliases:
+                self.logger.info(
+                    "Aliased '%s' to '%s'", old_host, aliases[old_host]
+                )
+        self.args.targets = [aliases.get(h, h) for h in self.args.targets]
 
         return config
 
+    def _read_config_cache(
+        self, cache_file: Path, cache_key: tuple[int, int]
+    ) -> dict | None:
+        """Read cached configuration (returns None if not up-to-date)."""
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as in_file:
+                (key, config) = json.load(in_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, TypeError, ValueError) as exc:
+            self.logger.debug(
+                "Could not read configuration cache '%s': %s", cache_file, exc
+            )
+            return None
+        if tuple(key) != cache_key:
+            return None
+        self.logger.debug("Using configuration cache '%s'", cache_file)
+        return config
+
     def _run_sync(self) -> None:
         """Run entire synchronization process."""
-        # Perform pre-command
-        logging.debug(
-            "Performing pre-command: '%s'",
-            self._PRE_COMMAND.replace('\n', ' '),
-        )
         self.logger.info(
             "Running at most %d concurrent task(s)", self.args.ntasks
         )
-        pre_comm = subprocess.Popen(
-            self._PRE_COMMAND,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        (out, err) = pre_comm.communicate()
-        stdout = out.decode('utf-8')
-        stderr = err.decode('utf-8')
-        if stdout:
-            logging.info(stdout.strip('\n'))
-        if stderr:
-            logging.error(stderr.strip('\n'))
-        logging.info("")
+
+        # Check for already running SSH master connections to remote target
+        # hosts (e.g., from a concurrent run of this script), which are reused
+        remote_hosts = [
+            host for host in self.target_hosts
+            if host not in self.target_paths
+        ]
+        new_hosts = []
+        for host in remote_hosts:
+            if self._check_control_master(host):
+                self.logger.debug(
+                    "Reusing SSH master connection to '%s'", host
+                )
+            else:
+                new_hosts.append(host)
+
+        # Perform pre-command (only necessary if new SSH connections need to
+        # be established)
+        pre_command = shutil.which(self._PRE_COMMAND)
+        if not new_hosts:
+            self.logger.debug(
+                "No new SSH connections necessary, skipping pre-command"
+            )
+        elif pre_command is None:
+            self.logger.debug(
+                "Pre-command '%s' not available, skipping it",
+                self._PRE_COMMAND,
+            )
+        else:
+            self.logger.debug("Performing pre-command: '%s'", pre_command)
+            pre_comm = subprocess.run(
+                [pre_command],
+                capture_output=True,
+                encoding='utf-8',
+                errors='replace',
+            )
+            if pre_comm.stdout:
+                self.logger.info(pre_comm.stdout.strip('\n'))
+            if pre_comm.stderr:
+                self.logger.error(pre_comm.stderr.strip('\n'))
+        self.logger.info("")
 
         # Get synchronization direction
         # Note: If no option is given, also perform both directions
@@ -435,86 +835,61 @@ class Sync():
             perform_up = self.args.up
             perform_down = self.args.down
 
-        # Loop over all target hosts
-        if self.args.dry_run:
-            dry_run_str = "simulation of "
+        # Simple case (one-way synchronization of a single element with a
+        # single host without log file): directly run rsync in this process
+        if perform_up != perform_down:
+            self._exec_sync('up' if perform_up else 'down')
+
+        # Open SSH master connections
+        self._open_control_masters(new_hosts)
+
+        # Synchronize all target hosts concurrently (use uvloop's event loop
+        # if available; `uvloop.run` is not available in older versions and
+        # `asyncio.Runner` not in Python < 3.11)
+        coroutine = self._process_hosts(perform_up, perform_down)
+        if uvloop is None:
+            asyncio.run(coroutine)
+        elif hasattr(asyncio, 'Runner'):
+            with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+                runner.run(coroutine)
         else:
-            dry_run_str = ""
-        for target_host in self.target_hosts:
-            logging.debug(
-                "Started %ssynchronization between '%s' and '%s'",
-                dry_run_str,
-                self.this_host,
-                target_host,
-            )
-
-            # Sync
-            success_up = True
-            success_down = True
-            if perform_up:
-                logging.info(
-                    "Started %supload '%s' --> '%s'",
-                    dry_run_str,
-                    self.this_host,
-                    target_host,
-                )
-                success_up = asyncio.run(self._process_host(target_host, 'up'))
-            if perform_down:
-                logging.info(
-                    "Started %sdownload '%s' --> '%s'",
-                    dry_run_str,
-                    target_host,
-                    self.this_host,
-                )
-                success_down = asyncio.run(
-                    self._process_host(target_host, 'down')
-                )
-            successful = (success_up and success_down)
-
-            # Log
-            prefix = "Simulated" if self.args.dry_run else "Completed"
-            if successful:
-                logging.info(
-                    "%s synchronization between '%s' and '%s'",
-                    prefix,
-                    self.this_host,
-                    target_host,
-                )
-            else:
-                logging.warning(
-                    "%s synchronization between '%s' and '%s' with error(s)",
-                    prefix,
-                    self.this_host,
-                    target_host,
-                )
-            logging.info("")
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            asyncio.run(coroutine)
 
-        logging.debug("Finished synchronization script")
-        logging.info("%s\n", self._DELIMITER)
+        self.logger.debug("Finished synchronization script")
+        self.logger.info("%s\n", self._DELIMITER)
 
     def _setup_logger(self) -> logging.Logger:
         """Setup the logging functionality."""
-        logger = logging.getLogger()
+        logger = logging.getLogger(self._LOGGER_NAME)
 
         if self.args.verbose:
             logger.setLevel(logging.DEBUG)
         else:
             logger.setLevel(logging.INFO)
 
-        # Add NullHandler (required when no output is desired)
-        null_handler = logging.NullHandler()
-        logger.addHandler(null_handler)
-
-        # Real handlers
+        # Real handlers (records for the log file are buffered and written
+        # in batches; the buffer is flushed on warnings and errors and when
+        # logging is shut down at exit)
         if not self.args.no_logfile:
             file_log_handler = logging.FileHandler(self.args.logfile, mode='a')
             file_log_handler.setFormatter(self._LOG_FORMATTER)
-            logger.addHandler(file_log_handler)
+            logger.addHandler(logging.handlers.MemoryHandler(
+                self._LOG_BUFFER_CAPACITY,
+                flushLevel=logging.WARNING,
+                target=file_log_handler,
+            ))
         if not self.args.quiet:
             console_log_handler = logging.StreamHandler()
             console_log_handler.setFormatter(self._LOG_FORMATTER)
             logger.addHandler(console_log_handler)
 
+        # If no output is desired, add NullHandler (otherwise, warnings and
+        # errors would be printed to stderr) and skip creation of all messages
+        if not logger.handlers:
+            logger.addHandler(logging.NullHandler())
+            logger.setLevel(logging.CRITICAL + 1)
+
         return logger
 
     def _setup_parser(self) -> ArgumentParser:
@@ -541,7 +916,11 @@ class Sync():
             help="Specify synchronization log file",
         )
         parser.add_argument(
-            '-e', '--exclude', action='append', help="Exclude certain files"
+            '-e',
+            '--exclude',
+            action='append',
+            default=[],
+            help="Exclude certain files",
         )
         parser.add_argument(
             '-d', '--down', action='store_true', help="Only download files"
@@ -579,9 +958,124 @@ class Sync():
             default=self._DEFAULT_NTASKS,
             help="Maximum number of concurrently run synchronization tasks",
         )
+        parser.add_argument(
+            '-c',
+            '--cipher',
+            type=str,
+            default=self._DEFAULT_CIPHER,
+            help="SSH cipher used for data transfer ('': use SSH default)",
+        )
+        parser.add_argument(
+            '-z',
+            '--compress',
+            action='store_true',
+            help="Compress data during transfer (useful for slow networks)",
+        )
+        parser.add_argument(
+            '-W',
+            '--whole-file',
+            action='store_true',
+            help="Copy whole files without delta-transfer (fast networks)",
+        )
+        parser.add_argument(
+            '-B',
+            '--block-size',
+            type=int,
+            help="Block size (in bytes) of rsync's delta-transfer algorithm",
+        )
+        parser.add_argument(
+            '-j',
+            '--jobs',
+            type=int,
+            default=self._DEFAULT_JOBS,
+            help="Maximum number of concurrently synchronized hosts",
+        )
 
         return parser
 
+    async def _sync_host(
+        self, target_host: str, perform_up: bool, perform_down: bool
+    ) -> None:
+        """Perform synchronization with one host."""
+        if self.args.dry_run:
+            dry_run_str = "simulation of "
+        else:
+            dry_run_str = ""
+        self.logger.debug(
+            "Started %ssynchronization between '%s' and '%s'",
+            dry_run_str,
+            self.this_host,
+            target_host,
+        )
+
+        # Sync (download after upload: all files that have just been uploaded
+        # have identical sizes and modification times on both hosts and are
+        # skipped by rsync's quick check, so the download only transfers files
+        # that are new or newer on the target host)
+        success_up = True
+        success_down = True
+        if perform_up:
+            success_up = await self._process_host(target_host, 'up')
+        if perform_down:
+            success_down = await self._process_host(target_host, 'down')
+        successful = (success_up and success_down)
+
+        # Log
+        prefix = "Simulated" if self.args.dry_run else "Completed"
+        if successful:
+            self.logger.info(
+                "%s synchronization between '%s' and '%s'",
+                prefix,
+                self.this_host,
+                target_host,
+            )
+        else:
+            self.logger.warning(
+                "%s synchronization between '%s' and '%s' with error(s)",
+                prefix,
+                self.this_host,
+                target_host,
+            )
+        self.logger.info("")
+
+    def _write_config_cache(
+        self, cache_file: Path, cache_key: tuple[int, int], config: dict
+    ) -> None:
+        """Write configuration cache.
+
+        The cache is written to a temporary file which then replaces the old
+        cache atomically, so concurrent runs never read an incomplete cache.
+        Configurations that cannot be represented exactly in JSON (e.g.,
+        non-string keys) are not cached.
+
+        """
+        try:
+            cache = json.dumps([cache_key, config])
+            if json.loads(cache)[1] != config:
+                self.logger.debug(
+                    "Configuration cannot be cached, skipping '%s'",
+                    cache_file,
+                )
+                return
+            with tempfile.NamedTemporaryFile(
+                mode='w',
+                encoding='utf-8',
+                dir=cache_file.parent,
+                prefix=f'{cache_file.name}.',
+                delete=False,
+            ) as out_file:
+                try:
+                    out_file.write(cache)
+                    out_file.close()
+                    os.replace(out_file.name, cache_file)
+                except OSError:
+                    os.remove(out_file.name)
+                    raise
+        except (OSError, TypeError, ValueError) as exc:
+            self.logger.debug(
+                "Could not write configuration cache '%s': %s", cache_file, exc
+            )
+
     @staticmethod
     def _expanduser(path: str) -> str:
         """Make sure that trailing '/' are handled correctly."""
@@ -592,6 +1086,45 @@ class Sync():
         path = str(Path(path).expanduser())
         return f'{path}{suffix}'
 
+    @staticmethod
+    def _match_host(hostname: str, hosts: dict[str, None]) -> str | None:
+        """Find host in configured hosts.
+
+        Exact matches of the full or short hostname (up to the first dot) are
+        preferred. Otherwise, the longest host contained in the hostname is
+        used.
+
+        """
+        if hostname in hosts:
+            return hostname
+        shortname = hostname.split('.')[0]
+        if shortname in hosts:
+            return shortname
+        return max(
+            [host for host in hosts if host in hostname],
+            key=len,
+            default=None,
+        )
+
+    @staticmethod
+    async def _read_lines(stream: asyncio.StreamReader) -> AsyncIterator[str]:
+        """Read lines from stream without buffering its entire content.
+
+        Progress updates of rsync are only separated by carriage returns, so
+        only the last of them needs to be kept in the buffer.
+
+        """
+        buffer = b''
+        while chunk := await stream.read(Sync._CHUNK_SIZE):
+            buffer += chunk
+            (*lines, buffer) = buffer.split(b'\n')
+            for line in lines:
+                yield line.decode('utf-8', errors='replace')
+            if b'\r' in buffer:
+                buffer = buffer[buffer.rindex(b'\r'):]
+        if buffer:
+            yield buffer.decode('utf-8', errors='replace')
+
     def print_help(self) -> None:
         """Print help messages."""
         self.parser.print_help()